@@ -1,14 +1,57 @@
+import asyncio
+import base64
+import logging
 import os
+import re
+import time
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from fastapi import FastAPI, HTTPException, Query, Path, Body
+import msgspec
+import orjson
+from bson.objectid import ObjectId
+from fastapi import FastAPI, Depends, HTTPException, Query, Path, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
 from database import db, create_document, get_documents
 
-app = FastAPI(title="Jo's Time Tracker API")
+logger = logging.getLogger(__name__)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+
+# Handlers returning raw Mongo documents return an instance directly, which also
+# skips FastAPI's jsonable_encoder pass.
+class MongoJSONResponse(ORJSONResponse):
+    """orjson response that encodes ObjectId and marks Mongo's naive datetimes as UTC"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        )
+
+
+# interactive docs and the OpenAPI schema are only served outside production
+PRODUCTION = os.getenv("ENVIRONMENT", "").lower() == "production"
+
+app = FastAPI(
+    title="Jo's Time Tracker API",
+    default_response_class=MongoJSONResponse,
+    docs_url=None if PRODUCTION else "/docs",
+    redoc_url=None if PRODUCTION else "/redoc",
+    openapi_url=None if PRODUCTION else "/openapi.json",
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,15 +60,124 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# added last so it wraps CORS; small bodies such as preflights stay uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+
+# True once the unique index on client.name exists; until then create_client
+# checks for an existing name itself
+_client_names_unique = False
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    global _client_names_unique
+    if db is None:
+        return
+    await db["timeentry"].create_index([("start_time", -1), ("_id", -1)])
+    await db["timeentry"].create_index([("client_id", 1), ("start_time", -1), ("_id", -1)])
+    await db["timeentry"].create_index([("end_time", 1), ("start_time", -1)])
+    try:
+        await db["client"].create_index("name", unique=True)
+        _client_names_unique = True
+    except OperationFailure as e:
+        if e.code != 11000:
+            raise
+        # older check-then-insert writes can have left duplicate names behind
+        logger.warning("Unique index on client.name not created; resolve duplicate client names: %s", e)
+    await db["client"].create_index("name_lower")
+    await db["project"].create_index([("client_id", 1), ("name_lower", 1)])
+    await db["project"].create_index("name_lower")
+    # backfill the typeahead key for documents created before it existed, lowercased
+    # in Python like new documents ($toLower only handles ASCII)
+    for coll in ("client", "project"):
+        ops = [
+            UpdateOne({"_id": d["_id"]}, {"$set": {"name_lower": str(d.get("name") or "").lower()}})
+            async for d in db[coll].find({"name_lower": {"$exists": False}}, {"name": 1})
+        ]
+        if ops:
+            await db[coll].bulk_write(ops, ordered=False)
+
+
+@app.on_event("startup")
+def build_openapi_schema():
+    # app.openapi() caches the schema, so the first /openapi.json request doesn't pay for it
+    if app.openapi_url:
+        app.openapi()
+
+
+# Summary totals only change when a time entry is written, so serve them
+# from a short-lived in-process cache that write paths invalidate.
+SUMMARY_TTL_SECONDS = 60
+_summary_cache = None  # (expires_at, totals)
+# bumped on every write so an aggregation that raced a write doesn't repopulate the cache
+_summary_generation = 0
+
+
+def invalidate_summary():
+    global _summary_cache, _summary_generation
+    _summary_cache = None
+    _summary_generation += 1
+
+
+# Projections keeping list payloads to the fields clients actually use
+NAME_LOOKUP_EXCLUDE = {"name_lower": 0}
+TIME_ENTRY_MAX_PAGE_SIZE = 500
+TIME_ENTRY_LIST_FIELDS = {
+    "_id": 1, "client_id": 1, "project_id": 1, "start_time": 1, "end_time": 1,
+    "break_minutes": 1, "hourly_rate": 1, "notes": 1, "worked_minutes": 1,
+}
+
 
 # Helper utilities
 
-def to_object_id(id_str: str):
-    from bson.objectid import ObjectId  # available via pymongo
+async def _exists(collection_name: str, oid) -> bool:
+    return await db[collection_name].find_one({"_id": oid}, {"_id": 1}) is not None
+
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque pagination cursor carrying the (start_time, _id) sort key of `doc`"""
+    start = doc.get("start_time")
+    key = [str(doc["_id"]), start, isinstance(start, datetime)]
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode()
+
+
+def decode_cursor(cursor: str):
     try:
-        return ObjectId(id_str)
-    except Exception:
+        oid, start, is_date = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if is_date:
+            start = datetime.fromisoformat(start)
+        if not ObjectId.is_valid(oid):
+            raise ValueError(oid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return start, ObjectId(oid)
+
+
+def after_cursor(start, oid: ObjectId) -> list:
+    """$or clauses matching entries after (start, oid) in (start_time desc, _id desc) order"""
+    clauses = [{"start_time": start, "_id": {"$lt": oid}}]
+    if start is None:
+        return clauses
+    clauses.append({"start_time": {"$lt": start}})
+    # legacy entries with string or missing start_time sort below every date;
+    # missing/null values sort below strings
+    if isinstance(start, datetime):
+        clauses.append({"start_time": {"$not": {"$type": "date"}}})
+    else:
+        clauses.append({"start_time": None})
+    return clauses
+
+
+def prefix_filter(q: str) -> dict:
+    """Case-insensitive prefix match on the indexed name_lower field"""
+    return {"$regex": "^" + re.escape(q.lower())}
+
+
+def to_object_id(id_str: str) -> ObjectId:
+    if not ObjectId.is_valid(id_str):
         raise HTTPException(status_code=400, detail="Invalid id format")
+    return ObjectId(id_str)
 
 
 def compute_worked_minutes(start: datetime, end: Optional[datetime], break_minutes: int) -> int:
@@ -39,20 +191,49 @@ def compute_worked_minutes(start: datetime, end: Optional[datetime], break_minut
     return max(0, diff - (break_minutes or 0))
 
 
-# Request models
+def worked_minutes_expr(end="$end_time"):
+    """Aggregation expression mirroring compute_worked_minutes on the server side"""
+    elapsed_ms = {"$subtract": [end, "$start_time"]}
+    worked = {
+        "$max": [
+            0,
+            {"$subtract": [
+                {"$toInt": {"$floor": {"$divide": [elapsed_ms, 60000]}}},
+                {"$ifNull": ["$break_minutes", 0]},
+            ]},
+        ]
+    }
+    # fall back to the stored value for entries with malformed timestamps
+    dates_ok = {"$and": [
+        {"$eq": [{"$type": "$start_time"}, "date"]},
+        {"$eq": [{"$type": end}, "date"]},
+    ]}
+    return {"$cond": [dates_ok, worked, {"$ifNull": ["$worked_minutes", 0]}]}
+
+
+def current_worked_minutes_expr():
+    """Stored worked minutes for finished entries; only running timers are recomputed against now"""
+    return {"$cond": [
+        {"$ifNull": ["$end_time", False]},
+        {"$ifNull": ["$worked_minutes", worked_minutes_expr()]},
+        worked_minutes_expr("$$NOW"),
+    ]}
 
-class ClientIn(BaseModel):
+
+# Request models (msgspec structs, decoded straight from the raw request body)
+
+class ClientIn(msgspec.Struct):
     name: str
     notes: Optional[str] = None
 
 
-class ProjectIn(BaseModel):
+class ProjectIn(msgspec.Struct):
     name: str
     client_id: str
     notes: Optional[str] = None
 
 
-class TimeEntryIn(BaseModel):
+class TimeEntryIn(msgspec.Struct, kw_only=True):
     client_id: str
     project_id: Optional[str] = None
     start_time: datetime
@@ -62,20 +243,98 @@ class TimeEntryIn(BaseModel):
     notes: Optional[str] = None
 
 
-class SettingsIn(BaseModel):
+class TimeEntryPatch(msgspec.Struct):
+    client_id: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    project_id: Union[Optional[str], msgspec.UnsetType] = msgspec.UNSET
+    start_time: Union[datetime, msgspec.UnsetType] = msgspec.UNSET
+    end_time: Union[Optional[datetime], msgspec.UnsetType] = msgspec.UNSET
+    break_minutes: Union[int, msgspec.UnsetType] = msgspec.UNSET
+    hourly_rate: Union[Optional[float], msgspec.UnsetType] = msgspec.UNSET
+    notes: Union[Optional[str], msgspec.UnsetType] = msgspec.UNSET
+
+
+class SettingsIn(msgspec.Struct):
     theme: str = "system"
     timezone: str = "UTC"
     language: str = "en"
     date_format: str = "yyyy-MM-dd"
 
 
+DATETIME_FIELDS = ("start_time", "end_time")
+
+# msgspec message prefixes mapped to the error types FastAPI/Pydantic report
+_MSGSPEC_ERROR_TYPES = (
+    ("Invalid RFC3339 encoded datetime", "datetime_parsing"),
+    ("Expected `datetime", "datetime_type"),
+    ("Expected `str", "string_type"),
+    ("Expected `int", "int_type"),
+    ("Expected `float", "float_type"),
+    ("Expected `object", "model_type"),
+)
+
+
+def _parse_datetimes(raw, model):
+    # msgspec only takes full RFC3339 strings; keep accepting the ISO forms Pydantic
+    # did, e.g. "2024-01-01T09:00" from a datetime-local input or a bare "2024-01-01"
+    if not isinstance(raw, dict):
+        return raw
+    for field in DATETIME_FIELDS:
+        value = raw.get(field)
+        if field in model.__struct_fields__ and isinstance(value, str):
+            try:
+                raw[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass  # left as-is so msgspec reports the validation error
+    return raw
+
+
+def _validation_error(exc: msgspec.DecodeError) -> dict:
+    # reshape a msgspec error such as "Expected `int`, got `str` - at `$.break_minutes`"
+    # into the entry FastAPI puts in a 422 detail list
+    if not isinstance(exc, msgspec.ValidationError):
+        return {"type": "json_invalid", "loc": ["body"], "msg": "JSON decode error", "ctx": {"error": str(exc)}}
+    msg, _, path = str(exc).partition(" - at `$")
+    loc = ["body"] + [key or int(index) for key, index in re.findall(r"\.(\w+)|\[(\d+)\]", path)]
+    missing = re.match(r"Object missing required field `(\w+)`", msg)
+    if missing:
+        return {"type": "missing", "loc": loc + [missing.group(1)], "msg": "Field required"}
+    error_type = next((t for prefix, t in _MSGSPEC_ERROR_TYPES if msg.startswith(prefix)), "value_error")
+    return {"type": error_type, "loc": loc, "msg": msg}
+
+
+def decode_body(body: bytes, model):
+    try:
+        raw = msgspec.json.decode(body)
+        return msgspec.convert(_parse_datetimes(raw, model), type=model, strict=False)
+    except msgspec.DecodeError as e:
+        raise RequestValidationError([_validation_error(e)])
+
+
+def json_body(model):
+    """Dependency decoding the raw request body into `model`, so handlers can stay sync"""
+    async def dependency(request: Request):
+        return decode_body(await request.body(), model)
+    return dependency
+
+
+def body_schema(model) -> dict:
+    """openapi_extra documenting a msgspec struct as the JSON request body"""
+    schema = msgspec.json.schema(model)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema["$defs"][model.__name__]}},
+        }
+    }
+
+
 @app.get("/")
 def read_root():
     return {"message": "Jo's Time Tracker backend is running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -88,7 +347,7 @@ def test_database():
         if db is not None:
             response["database"] = "✅ Available"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
                 response["connection_status"] = "Connected"
@@ -105,87 +364,128 @@ def test_database():
 
 
 # Settings (single document collection: "settings")
+# Settings change rarely, so each worker keeps them in memory: loaded at
+# startup and refreshed by PUT instead of read from Mongo on every GET.
+_settings_cache = None
+# held across the Mongo write and cache update so concurrent PUTs can't leave them disagreeing
+_settings_lock = asyncio.Lock()
+
+
+@app.on_event("startup")
+async def load_settings():
+    global _settings_cache
+    doc = await db["settings"].find_one({}) if db is not None else None
+    if doc:
+        doc.pop("_id", None)
+    _settings_cache = doc or msgspec.structs.asdict(SettingsIn())
+
+
 @app.get("/api/settings")
-def get_settings():
-    doc = db["settings"].find_one({}) if db else None
-    if not doc:
-        return SettingsIn().model_dump()
-    doc.pop("_id", None)
-    return doc
+async def get_settings():
+    if _settings_cache is None:
+        return msgspec.structs.asdict(SettingsIn())
+    return MongoJSONResponse(_settings_cache)
 
 
-@app.put("/api/settings")
-def update_settings(payload: SettingsIn):
+@app.put("/api/settings", openapi_extra=body_schema(SettingsIn))
+async def update_settings(payload: SettingsIn = Depends(json_body(SettingsIn))):
+    global _settings_cache
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    db["settings"].update_one({}, {"$set": payload.model_dump()}, upsert=True)
-    return payload.model_dump()
+    data = msgspec.structs.asdict(payload)
+    async with _settings_lock:
+        await db["settings"].update_one({}, {"$set": data}, upsert=True)
+        # mirror the $set so fields outside SettingsIn survive, as they do in Mongo
+        _settings_cache = {**(_settings_cache or {}), **data}
+    return data
 
 
 # Clients
-@app.post("/api/clients")
-def create_client(payload: ClientIn):
-    existing = db["client"].find_one({"name": payload.name}) if db else None
-    if existing:
+@app.post("/api/clients", openapi_extra=body_schema(ClientIn))
+async def create_client(payload: ClientIn = Depends(json_body(ClientIn))):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not available")
+    if not _client_names_unique and await db["client"].find_one({"name": payload.name}, {"_id": 1}):
+        raise HTTPException(status_code=409, detail="Client already exists")
+    data = msgspec.structs.asdict(payload)
+    data["name_lower"] = payload.name.lower()
+    try:
+        new_id = await create_document("client", data)
+    except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="Client already exists")
-    new_id = create_document("client", payload.model_dump())
     return {"_id": new_id}
 
 
 @app.get("/api/clients")
-def list_clients(q: Optional[str] = Query(None, description="Typeahead query")):
-    flt = {"name": {"$regex": q, "$options": "i"}} if q else {}
-    docs = get_documents("client", flt)
-    for d in docs:
-        d["_id"] = str(d["_id"])
-    return docs
+async def list_clients(q: Optional[str] = Query(None, description="Typeahead query")):
+    flt = {"name_lower": prefix_filter(q)} if q else {}
+    docs = await get_documents("client", flt, projection=NAME_LOOKUP_EXCLUDE)
+    return MongoJSONResponse(docs)
 
 
 # Projects
-@app.post("/api/projects")
-def create_project(payload: ProjectIn):
+@app.post("/api/projects", openapi_extra=body_schema(ProjectIn))
+async def create_project(payload: ProjectIn = Depends(json_body(ProjectIn))):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    if db["client"].count_documents({"_id": to_object_id(payload.client_id)}) == 0:
+    if not await _exists("client", to_object_id(payload.client_id)):
         raise HTTPException(status_code=404, detail="Client not found")
-    new_id = create_document("project", payload.model_dump())
+    data = msgspec.structs.asdict(payload)
+    data["name_lower"] = payload.name.lower()
+    new_id = await create_document("project", data)
     return {"_id": new_id}
 
 
 @app.get("/api/projects")
-def list_projects(client_id: Optional[str] = None, q: Optional[str] = None):
+async def list_projects(client_id: Optional[str] = None, q: Optional[str] = None):
     flt = {}
     if client_id:
         flt["client_id"] = client_id
     if q:
-        flt["name"] = {"$regex": q, "$options": "i"}
-    docs = get_documents("project", flt)
-    for d in docs:
-        d["_id"] = str(d["_id"])
-    return docs
+        flt["name_lower"] = prefix_filter(q)
+    docs = await get_documents("project", flt, projection=NAME_LOOKUP_EXCLUDE)
+    return MongoJSONResponse(docs)
 
 
 # Time Entries
-@app.post("/api/time-entries")
-def create_time_entry(payload: TimeEntryIn):
+async def insert_time_entry(payload: TimeEntryIn):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    if db["client"].count_documents({"_id": to_object_id(payload.client_id)}) == 0:
+    client_oid = to_object_id(payload.client_id)
+    project_oid = to_object_id(payload.project_id) if payload.project_id else None
+    # run the client and project lookups concurrently rather than back to back
+    checks = [_exists("client", client_oid)]
+    if project_oid is not None:
+        checks.append(_exists("project", project_oid))
+    client_found, *project_found = await asyncio.gather(*checks)
+    if not client_found:
         raise HTTPException(status_code=404, detail="Client not found")
-    if payload.project_id:
-        if db["project"].count_documents({"_id": to_object_id(payload.project_id)}) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
+    if project_found and not project_found[0]:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    data = payload.model_dump()
+    data = msgspec.structs.asdict(payload)
     worked_minutes = compute_worked_minutes(payload.start_time, payload.end_time, payload.break_minutes or 0)
     data["worked_minutes"] = worked_minutes
 
-    new_id = create_document("timeentry", data)
+    new_id = await create_document("timeentry", data)
+    invalidate_summary()
     return {"_id": new_id, "worked_minutes": worked_minutes}
 
 
+@app.post("/api/time-entries", openapi_extra=body_schema(TimeEntryIn))
+async def create_time_entry(payload: TimeEntryIn = Depends(json_body(TimeEntryIn))):
+    return await insert_time_entry(payload)
+
+
 @app.get("/api/time-entries")
-def list_time_entries(month: Optional[str] = None, client_id: Optional[str] = None):
+async def list_time_entries(
+    month: Optional[str] = None,
+    client_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=TIME_ENTRY_MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="Cursor: the `next` value from the previous page"),
+):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not available")
     flt = {}
     if client_id:
         flt["client_id"] = client_id
@@ -197,70 +497,87 @@ def list_time_entries(month: Optional[str] = None, client_id: Optional[str] = No
             flt["start_time"] = {"$gte": start, "$lt": end}
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid month format; expected YYYY-MM")
-
-    docs = get_documents("timeentry", flt)
-    for d in docs:
-        d["_id"] = str(d["_id"])
-        start = d.get("start_time")
-        end = d.get("end_time")
-        break_min = d.get("break_minutes", 0)
-        try:
-            worked = compute_worked_minutes(start, end, break_min)
-        except Exception:
-            worked = d.get("worked_minutes", 0)
-        d["worked_minutes"] = worked
-    docs.sort(key=lambda x: x.get("start_time", datetime.min), reverse=True)
-    return docs
-
-
-@app.patch("/api/time-entries/{entry_id}")
-def update_time_entry(entry_id: str, payload: dict = Body(...)):
+    if before:
+        flt["$or"] = after_cursor(*decode_cursor(before))
+
+    # sort and cap first so the start_time index drives the scan and only returned
+    # entries go through the projection and worked-minutes expression
+    pipeline = [
+        {"$match": flt},
+        {"$sort": {"start_time": -1, "_id": -1}},
+        # one extra entry tells us whether another page exists
+        {"$limit": limit + 1},
+        {"$project": TIME_ENTRY_LIST_FIELDS},
+        {"$addFields": {"worked_minutes": current_worked_minutes_expr()}},
+    ]
+    docs = await db["timeentry"].aggregate(pipeline).to_list(None)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_cursor(docs[-1]) if has_more else None
+    return MongoJSONResponse({"items": docs, "next": next_cursor})
+
+
+@app.patch("/api/time-entries/{entry_id}", openapi_extra=body_schema(TimeEntryPatch))
+async def update_time_entry(entry_id: str, payload: TimeEntryPatch = Depends(json_body(TimeEntryPatch))):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    # sanitize fields
-    allowed = {"start_time", "end_time", "break_minutes", "hourly_rate", "notes", "client_id", "project_id"}
-    update = {k: v for k, v in payload.items() if k in allowed}
+    # unknown fields are dropped by the struct; only explicitly sent ones are applied
+    update = {
+        k: getattr(payload, k) for k in payload.__struct_fields__
+        if getattr(payload, k) is not msgspec.UNSET
+    }
     if not update:
         raise HTTPException(status_code=400, detail="No valid fields to update")
-    db["timeentry"].update_one({"_id": to_object_id(entry_id)}, {"$set": update})
-    doc = db["timeentry"].find_one({"_id": to_object_id(entry_id)})
+    # apply the update and recompute worked minutes in a single pipeline update
+    doc = await db["timeentry"].find_one_and_update(
+        {"_id": to_object_id(entry_id)},
+        [
+            {"$set": {k: {"$literal": v} for k, v in update.items()}},
+            {"$set": {"worked_minutes": worked_minutes_expr({"$ifNull": ["$end_time", "$$NOW"]})}},
+        ],
+        return_document=ReturnDocument.AFTER,
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Time entry not found")
-    # recompute worked minutes
-    worked = compute_worked_minutes(doc.get("start_time"), doc.get("end_time"), doc.get("break_minutes", 0))
-    db["timeentry"].update_one({"_id": to_object_id(entry_id)}, {"$set": {"worked_minutes": worked}})
-    doc["_id"] = str(doc["_id"])
-    doc["worked_minutes"] = worked
-    return doc
+    invalidate_summary()
+    return MongoJSONResponse(doc)
 
 
 @app.post("/api/punch/start")
-def punch_start(client_id: str, project_id: Optional[str] = None, notes: Optional[str] = None):
+async def punch_start(client_id: str, project_id: Optional[str] = None, notes: Optional[str] = None):
     now = datetime.now(timezone.utc)
     payload = TimeEntryIn(client_id=client_id, project_id=project_id, start_time=now, end_time=None, notes=notes)
-    return create_time_entry(payload)
+    return await insert_time_entry(payload)
 
 
 @app.post("/api/punch/stop")
-def punch_stop():
+async def punch_stop():
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    doc = db["timeentry"].find_one({"end_time": None}, sort=[("start_time", -1)])
+    # stop the most recent running timer and compute its worked minutes in one round trip
+    doc = await db["timeentry"].find_one_and_update(
+        {"end_time": None},
+        [
+            {"$set": {"end_time": "$$NOW"}},
+            {"$set": {"worked_minutes": worked_minutes_expr()}},
+        ],
+        sort=[("start_time", -1)],
+        return_document=ReturnDocument.AFTER,
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="No running timer")
-    end = datetime.now(timezone.utc)
-    worked = compute_worked_minutes(doc.get("start_time"), end, doc.get("break_minutes", 0))
-    db["timeentry"].update_one({"_id": doc["_id"]}, {"$set": {"end_time": end, "worked_minutes": worked}})
-    doc = db["timeentry"].find_one({"_id": doc["_id"]})
-    doc["_id"] = str(doc["_id"])
-    doc["worked_minutes"] = worked
-    return doc
+    invalidate_summary()
+    return MongoJSONResponse(doc)
 
 
 @app.get("/api/summary")
-def get_summary():
+async def get_summary():
+    global _summary_cache
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
+    if _summary_cache is not None and _summary_cache[0] > time.monotonic():
+        return _summary_cache[1]
+    generation = _summary_generation
     now = datetime.now(timezone.utc)
     day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     week_start = day_start - timedelta(days=day_start.weekday())
@@ -281,14 +598,25 @@ def get_summary():
         "prev_month": (prev_month_start, month_start),
     }
 
-    result = {}
-    for key, (start, end) in ranges.items():
-        cursor = db["timeentry"].find({"start_time": {"$gte": start, "$lt": end}})
-        total = 0
-        for d in cursor:
-            total += compute_worked_minutes(d.get("start_time"), d.get("end_time"), d.get("break_minutes", 0))
-        result[key] = total
-
+    # the week can straddle either month boundary, so bound the outer match by all ranges
+    lower = min(start for start, _ in ranges.values())
+    upper = max(end for _, end in ranges.values())
+    worked = current_worked_minutes_expr()
+    pipeline = [
+        {"$match": {"start_time": {"$gte": lower, "$lt": upper}}},
+        {"$project": {"start_time": 1, "end_time": 1, "break_minutes": 1, "worked_minutes": 1}},
+        {"$facet": {
+            key: [
+                {"$match": {"start_time": {"$gte": start, "$lt": end}}},
+                {"$group": {"_id": None, "total": {"$sum": worked}}},
+            ]
+            for key, (start, end) in ranges.items()
+        }},
+    ]
+    facets = await db["timeentry"].aggregate(pipeline).next()
+    result = {key: facets[key][0]["total"] if facets[key] else 0 for key in ranges}
+    if generation == _summary_generation:
+        _summary_cache = (time.monotonic() + SUMMARY_TTL_SECONDS, result)
     return result
 
 
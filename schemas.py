@@ -4,20 +4,26 @@ Database Schemas for Jo's Time Tracker
 Each Pydantic model maps to a MongoDB collection with the lowercase class name.
 """
 from __future__ import annotations
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 
 class Client(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     name: str = Field(..., description="Client name")
     notes: Optional[str] = Field(None, description="Optional notes about the client")
 
 class Project(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     name: str = Field(..., description="Project name")
     client_id: str = Field(..., description="Reference to client _id as string")
     notes: Optional[str] = Field(None, description="Optional notes about the project")
 
 class TimeEntry(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     client_id: str = Field(..., description="Reference to client _id as string")
     project_id: Optional[str] = Field(None, description="Reference to project _id as string")
     start_time: datetime = Field(..., description="Start datetime in ISO format")
@@ -27,6 +33,8 @@ class TimeEntry(BaseModel):
     notes: Optional[str] = Field(None, description="Notes for this time entry")
 
 class Settings(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     theme: str = Field("system", description="light | dark | system")
     timezone: str = Field("UTC", description="IANA timezone string, e.g., 'America/Los_Angeles'")
     language: str = Field("en", description="ISO language code")
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from main import TimeEntryIn, TimeEntryPatch, decode_body, decode_cursor, encode_cursor
+
+
+def test_time_entry_accepts_minute_precision_datetime():
+    # what an HTML datetime-local input submits
+    payload = decode_body(b'{"client_id": "c1", "start_time": "2024-01-01T09:00"}', TimeEntryIn)
+    assert payload.start_time == datetime(2024, 1, 1, 9, 0)
+
+
+def test_time_entry_accepts_date_only():
+    payload = decode_body(b'{"client_id": "c1", "start_time": "2024-01-01"}', TimeEntryIn)
+    assert payload.start_time == datetime(2024, 1, 1)
+
+
+def test_invalid_datetime_is_rejected():
+    with pytest.raises(RequestValidationError) as exc:
+        decode_body(b'{"client_id": "c1", "start_time": "not a date"}', TimeEntryIn)
+    error, = exc.value.errors()
+    assert error["loc"] == ["body", "start_time"]
+    assert error["type"] == "datetime_parsing"
+
+
+def test_missing_field_is_reported_by_name():
+    with pytest.raises(RequestValidationError) as exc:
+        decode_body(b'{"start_time": "2024-01-01T09:00"}', TimeEntryIn)
+    error, = exc.value.errors()
+    assert error["loc"] == ["body", "client_id"]
+    assert error["type"] == "missing"
+
+
+def test_wrong_type_is_reported():
+    with pytest.raises(RequestValidationError) as exc:
+        decode_body(b'{"client_id": 1, "start_time": "2024-01-01"}', TimeEntryIn)
+    error, = exc.value.errors()
+    assert error["loc"] == ["body", "client_id"]
+    assert error["type"] == "string_type"
+
+
+def test_patch_accepts_minute_precision_end_time():
+    payload = decode_body(b'{"end_time": "2024-01-01T17:30"}', TimeEntryPatch)
+    assert payload.end_time == datetime(2024, 1, 1, 17, 30)
+
+
+@pytest.mark.parametrize("start", [datetime(2024, 1, 1, 9, 0), "2024-01-01T09:00", None])
+def test_cursor_round_trips_sort_key(start):
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor({"_id": oid, "start_time": start})) == (start, oid)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400